@@ -2,6 +2,7 @@ from fastapi import FastAPI, WebSocket, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Dict, Any
 import asyncio
+import orjson
 from sse_starlette.sse import EventSourceResponse
 from datetime import datetime
 
@@ -26,12 +27,19 @@ app.add_middleware(
 
 # Event store for SSE
 event_subscribers: Dict[str, asyncio.Queue] = {}
+# Set when the matching subscriber is removed
+unsubscribed_events: Dict[str, asyncio.Event] = {}
+
+def get_unsubscribed_event(client_id: str) -> asyncio.Event:
+    """Get an event that is set once client_id has no SSE subscriber"""
+    if client_id not in event_subscribers:
+        event = asyncio.Event()
+        event.set()
+        return event
+    return unsubscribed_events.setdefault(client_id, asyncio.Event())
 
 async def event_generator(request: Request, client_id: str):
     """Generate events for SSE streaming"""
-    if client_id not in event_subscribers:
-        event_subscribers[client_id] = asyncio.Queue()
-    
     try:
         while True:
             if await request.is_disconnected():
@@ -48,27 +56,62 @@ async def event_generator(request: Request, client_id: str):
             }
     except asyncio.CancelledError:
         pass
-    finally:
-        # Cleanup when client disconnects
-        if client_id in event_subscribers:
-            del event_subscribers[client_id]
+
+def unsubscribe(client_id: str):
+    """Drop client_id's SSE queue and wake anyone waiting for that"""
+    event_subscribers.pop(client_id, None)
+    unsubscribed = unsubscribed_events.pop(client_id, None)
+    if unsubscribed is not None:
+        unsubscribed.set()
+
+class SubscriberEventSourceResponse(EventSourceResponse):
+    """EventSourceResponse that unsubscribes its client however the response ends"""
+
+    def __init__(self, client_id: str, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.client_id = client_id
+
+    async def __call__(self, scope, receive, send):
+        # The generator's own cleanup never runs if the client is gone
+        # before the stream first iterates it
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            unsubscribe(self.client_id)
 
 @app.get("/events/{client_id}")
 async def sse_endpoint(request: Request, client_id: str):
     """SSE endpoint for real-time updates"""
-    event_source = EventSourceResponse(
+    # Subscribe before the response starts, so a client that has seen the
+    # headers can't miss events broadcast right after
+    if client_id not in event_subscribers:
+        event_subscribers[client_id] = asyncio.Queue()
+    event_source = SubscriberEventSourceResponse(
+        client_id,
         event_generator(request, client_id),
         ping=20000  # Send ping every 20 seconds to keep connection alive
     )
     return event_source
 
+def dumps(data: Any) -> str:
+    """Serialize to JSON text with orjson, falling back to str() for unknown types.
+
+    OPT_NON_STR_KEYS lets int keys (e.g. busy_times hours) through like json.dumps.
+    """
+    return orjson.dumps(
+        data, default=str, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    ).decode()
+
 async def broadcast_event(event_data: Dict[str, Any], target_client: str = None):
     """Broadcast event to all or specific client"""
+    # Serialize once for every subscriber; SSE data must be a string anyway
+    payload = dumps(event_data)
     if target_client and target_client in event_subscribers:
-        await event_subscribers[target_client].put(event_data)
+        event_subscribers[target_client].put_nowait(payload)
     else:
-        for queue in event_subscribers.values():
-            await queue.put(event_data)
+        # Snapshot so clients disconnecting mid-broadcast can't break iteration
+        for queue in list(event_subscribers.values()):
+            queue.put_nowait(payload)
 
 # WebSocket connection store
 websocket_connections: Dict[str, WebSocket] = {}
@@ -83,7 +126,7 @@ async def websocket_endpoint(websocket: WebSocket):
         while True:
             data = await websocket.receive_json()
             # Echo back the received data for now
-            await websocket.send_json({"status": "ok", "data": data})
+            await websocket.send_text(dumps({"status": "ok", "data": data}))
     except Exception as e:
         print(f"WebSocket error: {e}")
     finally:
@@ -110,10 +153,10 @@ async def terminal_websocket(websocket: WebSocket, session_id: str):
             # Handle different command types
             if data["type"] == "tool":
                 result = await handle_tool_command(session_id, data["tool"], data["params"])
-                await websocket.send_json(result)
+                await websocket.send_text(dumps(result))
             elif data["type"] == "tmux":
                 result = await handle_tmux_command(session_id, data["command"])
-                await websocket.send_json(result)
+                await websocket.send_text(dumps(result))
     finally:
         del sessions[session_id]
 
@@ -45,12 +45,24 @@ class ContextStore:
         ```
     """
     
-    def __init__(self, host: str = "localhost", port: int = 6333):
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6333,
+        prefer_grpc: bool = False,
+        pool_size: Optional[int] = None,
+        location: Optional[str] = None
+    ):
         """Initialize the context store with Qdrant connection.
         
         Args:
             host (str): Hostname of the Qdrant server. Defaults to "localhost".
             port (int): Port number of the Qdrant server. Defaults to 6333.
+            prefer_grpc (bool): Talk to Qdrant over gRPC instead of HTTP. Defaults to False.
+            pool_size (Optional[int]): Connection pool size for concurrent requests.
+                Defaults to the client's own default.
+            location (Optional[str]): Qdrant location such as ":memory:" for an
+                in-process instance. Overrides host when set. Defaults to None.
             
         Note:
             The initialization process includes:
@@ -59,7 +71,13 @@ class ContextStore:
             3. Ensuring the required collection exists
         """
         self.collection_name = "contexts"
-        self.client = QdrantClient(host=host, port=port)
+        self.client = QdrantClient(
+            location=location,
+            host=None if location else host,
+            port=port,
+            prefer_grpc=prefer_grpc,
+            pool_size=pool_size
+        )
         self.encoder = SentenceTransformer('all-MiniLM-L6-v2')
         self._ensure_collection()
     
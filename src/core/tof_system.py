@@ -17,11 +17,24 @@ logger = logging.getLogger(__name__)
 class ToFManager:
     """Manages context testing and validation"""
     
-    def __init__(self, qdrant_host: str = "localhost", qdrant_port: int = 6333):
+    def __init__(
+        self,
+        qdrant_host: str = "localhost",
+        qdrant_port: int = 6333,
+        prefer_grpc: bool = False,
+        pool_size: Optional[int] = None,
+        qdrant_location: Optional[str] = None
+    ):
         """Initialize the ToF manager"""
         self.contexts: Dict[str, Context] = {}  # Initialize as empty dict
         self.results: Dict[str, List[ValidationResult]] = {}  # Initialize as empty dict
-        self.context_store = ContextStore(host=qdrant_host, port=qdrant_port)
+        self.context_store = ContextStore(
+            host=qdrant_host,
+            port=qdrant_port,
+            prefer_grpc=prefer_grpc,
+            pool_size=pool_size,
+            location=qdrant_location
+        )
     
     async def register_context(
         self,
@@ -12,13 +12,18 @@ Fun fact: Trisha loves to vocally approve commits with accounting-themed message
 """
 
 import asyncio
+import atexit
+import hashlib
 import json
 import tempfile
+import threading
+from collections import OrderedDict
 from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 import edge_tts
+import numpy as np
 import sounddevice as sd
 import soundfile as sf
 from edge_tts import VoicesManager
@@ -53,6 +58,12 @@ class AIPersonality(Enum):
         "pitch": "+0Hz"  # Natural pitch for authority
     }
 
+# Frames per PortAudio period for playback streams
+PLAYBACK_BLOCKSIZE = 1024
+
+# Number of decoded clips kept in memory
+PCM_CACHE_SIZE = 32
+
 class VoiceManager:
     """Manages text-to-speech for different AI personalities."""
     
@@ -60,6 +71,11 @@ class VoiceManager:
         self._cache_dir = Path(tempfile.gettempdir()) / "mcp_voice_cache"
         self._cache_dir.mkdir(exist_ok=True)
         self._voices: Optional[list] = None
+        self._pcm_cache: "OrderedDict[Path, Tuple[np.ndarray, int]]" = OrderedDict()
+        self._streams: Dict[Tuple[int, int], sd.OutputStream] = {}
+        # say() plays from worker threads; guards the caches and stream writes
+        self._lock = threading.Lock()
+        atexit.register(self.close)
     
     async def _init_voices(self):
         """Initialize available voices."""
@@ -69,8 +85,11 @@ class VoiceManager:
     
     async def _get_voice_path(self, text: str, personality: AIPersonality) -> Path:
         """Get path for cached voice file or generate new one."""
-        # Create a unique filename based on text and personality
-        filename = f"{personality.name}_{hash(text)}.wav"
+        # Create a stable filename from the text and every voice setting
+        voice = personality.value
+        key = f"{personality.name}|{voice['voice']}|{voice['rate']}|{voice['volume']}|{voice['pitch']}|{text}"
+        digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        filename = f"{personality.name}_{digest}.wav"
         voice_path = self._cache_dir / filename
         
         if not voice_path.exists():
@@ -87,11 +106,45 @@ class VoiceManager:
         
         return voice_path
     
+    def _load_audio(self, path: Path) -> Tuple[np.ndarray, int]:
+        """Decode an audio file once and keep the PCM data in memory."""
+        if path in self._pcm_cache:
+            self._pcm_cache.move_to_end(path)
+            return self._pcm_cache[path]
+        data, samplerate = sf.read(str(path), dtype="float32", always_2d=True)
+        self._pcm_cache[path] = (np.ascontiguousarray(data), samplerate)
+        if len(self._pcm_cache) > PCM_CACHE_SIZE:
+            self._pcm_cache.popitem(last=False)
+        return self._pcm_cache[path]
+    
+    def _get_stream(self, samplerate: int, channels: int) -> sd.OutputStream:
+        """Get a long-lived output stream for the given audio format."""
+        key = (samplerate, channels)
+        if key not in self._streams:
+            stream = sd.OutputStream(
+                samplerate=samplerate,
+                channels=channels,
+                dtype="float32",
+                blocksize=PLAYBACK_BLOCKSIZE
+            )
+            stream.start()
+            self._streams[key] = stream
+        return self._streams[key]
+    
     def _play_audio(self, path: Path):
         """Play audio file using sounddevice."""
-        data, samplerate = sf.read(str(path))
-        sd.play(data, samplerate)
-        sd.wait()  # Wait until audio is finished playing
+        with self._lock:
+            data, samplerate = self._load_audio(path)
+            # Blocks until the whole buffer has been queued for playback
+            self._get_stream(samplerate, data.shape[1]).write(data)
+    
+    def close(self):
+        """Stop and release any open playback streams."""
+        with self._lock:
+            for stream in self._streams.values():
+                stream.stop()
+                stream.close()
+            self._streams.clear()
     
     async def say(self, text: str, personality: AIPersonality):
         """Speak text with specified personality."""
@@ -105,8 +158,8 @@ class VoiceManager:
             # Get voice file path (cached or new)
             voice_path = await self._get_voice_path(text, personality)
             
-            # Play the audio
-            self._play_audio(voice_path)
+            # Play the audio without blocking the event loop
+            await asyncio.to_thread(self._play_audio, voice_path)
             
         except Exception as e:
             console.print(f"[red]Failed to speak: {e}[/red]")
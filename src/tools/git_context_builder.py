@@ -3,10 +3,17 @@
 
 import argparse
 import asyncio
+import contextlib
+import copy
+import hashlib
 import logging
-from datetime import datetime
+import sqlite3
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 
 import git
 from git.repo import Repo
@@ -22,6 +29,31 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Number of analyze_context results kept in memory
+ANALYSIS_CACHE_SIZE = 8
+
+# Points sent to Qdrant per upsert request
+UPLOAD_BATCH_SIZE = 64
+
+# Only the head of a file is embedded, so never read more than this
+EMBED_READ_BYTES = 4096
+EMBED_CONTENT_CHARS = 1000
+# Larger blobs are indexed by path and metadata only
+MAX_EMBED_SIZE = 1024 * 1024
+# Types that are always binary; anything else goes through the NUL sniff
+BINARY_MIME_PREFIXES = (
+    "image/",
+    "audio/",
+    "video/",
+    "font/",
+    "application/octet-stream",
+    "application/pdf",
+    "application/zip",
+    "application/gzip",
+)
+# Text formats that fall under a binary prefix
+TEXT_MIME_TYPES = frozenset({"image/svg+xml"})
+
 class GitContextBuilder:
     """Builds and manages Git repository contexts."""
     
@@ -29,12 +61,88 @@ class GitContextBuilder:
         self,
         qdrant_host: str = "localhost",
         qdrant_port: int = 6333,
-        model_name: str = "all-MiniLM-L6-v2"
+        model_name: str = "all-MiniLM-L6-v2",
+        cache_dir: Optional[str] = None,
+        prefer_grpc: bool = False,
+        pool_size: Optional[int] = None,
+        qdrant_location: Optional[str] = None,
+        collection_suffix: str = ""
     ):
-        self.client = QdrantClient(host=qdrant_host, port=qdrant_port)
+        # prefer_grpc serializes ndarray vectors without building Python float
+        # lists, but needs Qdrant's gRPC port (6334) published
+        # qdrant_location (e.g. ":memory:") replaces the host when given
+        self.client = QdrantClient(
+            location=qdrant_location,
+            host=None if qdrant_location else qdrant_host,
+            port=qdrant_port,
+            prefer_grpc=prefer_grpc,
+            pool_size=pool_size
+        )
+        # In-process Qdrant is not thread-safe, so its concurrent uploads
+        # take turns; remote clients upload in parallel
+        self._upload_lock = (
+            threading.Lock() if qdrant_location == ":memory:" else contextlib.nullcontext()
+        )
+        # Appended to every collection name, so builders can share a server
+        self.collection_suffix = collection_suffix
+        self.model_name = model_name
         self.model = SentenceTransformer(model_name)
+        self._embedding_cache = self._open_embedding_cache(cache_dir)
+        self._analysis_cache: "OrderedDict[Tuple, Dict]" = OrderedDict()
         self._ensure_collections()
     
+    def _collection(self, name: str) -> str:
+        """Return the server-side name of one of the git_* collections."""
+        return f"{name}{self.collection_suffix}"
+    
+    @staticmethod
+    def _open_embedding_cache(cache_dir: Optional[str]) -> sqlite3.Connection:
+        """Open the on-disk embedding cache shared across builds."""
+        cache_path = Path(cache_dir) if cache_dir else Path(tempfile.gettempdir()) / "mcp_embedding_cache"
+        cache_path.mkdir(parents=True, exist_ok=True)
+        
+        cache = sqlite3.connect(str(cache_path / "embeddings.db"))
+        cache.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        return cache
+    
+    @staticmethod
+    def _point_id(context_name: str, key: str) -> str:
+        """Derive a stable point id that is unique to one context."""
+        # Two contexts built from the same repo must not overwrite each other
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{context_name}/{key}"))
+    
+    def _encode_many(self, texts: List[str]) -> np.ndarray:
+        """Encode texts, skipping duplicates and content cached by earlier builds."""
+        keys = [hashlib.sha256(f"{self.model_name}\0{text}".encode()).digest() for text in texts]
+        vectors: Dict[bytes, np.ndarray] = {}
+        pending: Dict[bytes, str] = {}
+        
+        for key, text in zip(keys, texts):
+            if key in vectors or key in pending:
+                continue
+            row = self._embedding_cache.execute(
+                "SELECT vector FROM embeddings WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                vectors[key] = np.frombuffer(row[0], dtype=np.float32)
+            else:
+                pending[key] = text
+        
+        if pending:
+            # One batched forward pass over the unique, uncached inputs
+            encoded = self.model.encode(list(pending.values()), batch_size=128).astype(np.float32)
+            self._embedding_cache.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                ((key, vector.tobytes()) for key, vector in zip(pending, encoded))
+            )
+            vectors.update(zip(pending, encoded))
+        
+        if not keys:
+            return np.empty((0, self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+        return np.stack([vectors[key] for key in keys])
+    
     def _ensure_collections(self) -> None:
         """Ensure required Qdrant collections exist."""
         collections = self.client.get_collections().collections
@@ -49,6 +157,7 @@ class GitContextBuilder:
         }
         
         for name, vector_size in required_collections.items():
+            name = self._collection(name)
             if name not in collection_names:
                 self.client.create_collection(
                     collection_name=name,
@@ -58,104 +167,241 @@ class GitContextBuilder:
                     )
                 )
                 logger.info(f"Created collection: {name}")
+        
+        self._ensure_payload_indexes()
+    
+    def _ensure_payload_indexes(self) -> None:
+        """Index the payload fields used for filtering and aggregation."""
+        # Keyword indexes let count/facet run server-side instead of scrolling
+        payload_indexes = {
+            "git_commits": {
+                "context_name": models.PayloadSchemaType.KEYWORD,
+                "author_email": models.PayloadSchemaType.KEYWORD,
+                "hour": models.PayloadSchemaType.INTEGER,
+            },
+            "git_files": {
+                "context_name": models.PayloadSchemaType.KEYWORD,
+                "size": models.PayloadSchemaType.INTEGER,
+                "extension": models.PayloadSchemaType.KEYWORD,
+            },
+            "git_authors": {
+                "context_name": models.PayloadSchemaType.KEYWORD,
+            },
+            "git_relationships": {
+                "context_name": models.PayloadSchemaType.KEYWORD,
+                "type": models.PayloadSchemaType.KEYWORD,
+            },
+        }
+        
+        for collection, fields in payload_indexes.items():
+            for field_name, field_schema in fields.items():
+                self.client.create_payload_index(
+                    collection_name=self._collection(collection),
+                    field_name=field_name,
+                    field_schema=field_schema
+                )
+    
+    @staticmethod
+    def _context_filter(context_name: str) -> models.Filter:
+        """Build a filter matching all points of a context."""
+        return models.Filter(
+            must=[
+                models.FieldCondition(
+                    key="context_name",
+                    match=models.MatchValue(value=context_name)
+                )
+            ]
+        )
+    
+    def _scroll_payloads(
+        self,
+        collection_name: str,
+        scroll_filter: Optional[models.Filter],
+        fields: List[str]
+    ) -> List[Dict]:
+        """Page through a collection returning only the requested payload fields."""
+        payloads = []
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=collection_name,
+                scroll_filter=scroll_filter,
+                with_payload=fields,
+                with_vectors=False,
+                limit=4096,
+                offset=offset
+            )
+            payloads.extend(p.payload for p in points)
+            if offset is None:
+                return payloads
+    
+    async def _upload(
+        self,
+        collection_name: str,
+        ids: List[str],
+        vectors: np.ndarray,
+        payloads: List[Dict],
+        batch_size: int = UPLOAD_BATCH_SIZE,
+        concurrency: int = 1
+    ) -> None:
+        """Upsert points in batch_size requests, at most `concurrency` at a time."""
+        if not ids:
+            return
+        vectors = vectors.astype(np.float32, copy=False)
+        # Threads, not upload_collection(parallel=...), which forks a process pool
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        def send(start: int) -> None:
+            end = start + batch_size
+            with self._upload_lock:
+                # Vectors stay a float32 array rather than lists
+                self.client.upload_collection(
+                    collection_name=collection_name,
+                    ids=ids[start:end],
+                    vectors=vectors[start:end],
+                    payload=payloads[start:end],
+                    batch_size=batch_size,
+                    wait=True
+                )
+        
+        async def upsert(start: int) -> None:
+            async with semaphore:
+                await asyncio.to_thread(send, start)
+        
+        await asyncio.gather(*(upsert(start) for start in range(0, len(ids), batch_size)))
     
     async def build_context(
         self,
         repo_path: str,
         context_name: str,
-        multi_repo: bool = False
+        multi_repo: bool = False,
+        batch_size: int = UPLOAD_BATCH_SIZE,
+        concurrency: int = 1
     ) -> None:
         """Build context from a Git repository."""
         repo = Repo(repo_path)
         logger.info(f"Building context for {repo_path} ({context_name})")
         
         # Process commits
-        await self._process_commits(repo, context_name)
+        await self._process_commits(repo, context_name, batch_size, concurrency)
         
         # Process files
-        await self._process_files(repo, context_name)
+        await self._process_files(repo, context_name, batch_size, concurrency)
         
         # Process authors
-        await self._process_authors(repo, context_name)
+        await self._process_authors(repo, context_name, batch_size, concurrency)
+        
+        # Persist newly computed embeddings for the next build
+        self._embedding_cache.commit()
         
         if not multi_repo:
             # Build initial relationships
             await self._build_relationships(context_name)
     
-    async def _process_commits(self, repo: Repo, context_name: str) -> None:
+    async def _process_commits(
+        self,
+        repo: Repo,
+        context_name: str,
+        batch_size: int = UPLOAD_BATCH_SIZE,
+        concurrency: int = 1
+    ) -> None:
         """Process and store commit information."""
+        ids, texts, payloads = [], [], []
         for commit in repo.iter_commits():
             # Create rich commit text
-            commit_text = f"""
+            texts.append(f"""
             Message: {commit.message}
             Author: {commit.author.name} <{commit.author.email}>
             Date: {commit.authored_datetime}
             Files: {', '.join(d.a_path for d in commit.diff(commit.parents[0] if commit.parents else git.NULL_TREE))}
-            """
-            
-            # Get commit vector
-            vector = self.model.encode(commit_text)
-            
-            # Store in Qdrant
-            self.client.upsert(
-                collection_name="git_commits",
-                points=[models.PointStruct(
-                    id=hash(str(commit.hexsha)),
-                    vector=vector.tolist(),
-                    payload={
-                        "context_name": context_name,
-                        "commit_hash": commit.hexsha,
-                        "message": commit.message,
-                        "author_name": commit.author.name,
-                        "author_email": commit.author.email,
-                        "timestamp": commit.authored_datetime.isoformat(),
-                        "stats": {
-                            "additions": commit.stats.total["insertions"],
-                            "deletions": commit.stats.total["deletions"],
-                            "files": commit.stats.total["files"],
-                        }
-                    }
-                )]
-            )
+            """)
+            ids.append(self._point_id(context_name, commit.hexsha))
+            payloads.append({
+                "context_name": context_name,
+                "commit_hash": commit.hexsha,
+                "message": commit.message,
+                "author_name": commit.author.name,
+                "author_email": commit.author.email,
+                "timestamp": commit.authored_datetime.isoformat(),
+                "hour": commit.authored_datetime.hour,
+                "stats": {
+                    "additions": commit.stats.total["insertions"],
+                    "deletions": commit.stats.total["deletions"],
+                    "files": commit.stats.total["files"],
+                }
+            })
+        
+        # Get commit vectors and store in Qdrant
+        await self._upload(self._collection("git_commits"), ids, self._encode_many(texts), payloads, batch_size, concurrency)
+    
+    @staticmethod
+    def _last_modified_dates(repo: Repo) -> Dict[str, str]:
+        """Map each path to the author date of the newest commit touching it."""
+        # Blobs carry no dates, so read them from one `git log` over HEAD;
+        # -z keeps paths unquoted
+        raw = repo.git.log("--format=%x1e%aI", "--name-only", "--no-renames", "-z", "HEAD")
+        dates: Dict[str, str] = {}
+        for record in raw.split("\x1e"):
+            date, *paths = record.split("\0")
+            for path in paths:
+                path = path.lstrip("\n")
+                if path:
+                    # Newest commits come first
+                    dates.setdefault(path, date)
+        return dates
     
-    async def _process_files(self, repo: Repo, context_name: str) -> None:
+    async def _process_files(
+        self,
+        repo: Repo,
+        context_name: str,
+        batch_size: int = UPLOAD_BATCH_SIZE,
+        concurrency: int = 1
+    ) -> None:
         """Process and store file information."""
+        last_modified = self._last_modified_dates(repo)
+        ids, texts, payloads = [], [], []
         for blob in repo.head.commit.tree.traverse():
             if blob.type != 'blob':
                 continue
             
-            try:
-                # Try to decode file content
-                content = blob.data_stream.read().decode('utf-8')
-                
-                # Create rich file text
-                file_text = f"""
-                Path: {blob.path}
-                Content: {content[:1000]}  # First 1000 chars for embedding
-                """
-                
-                # Get file vector
-                vector = self.model.encode(file_text)
-                
-                # Store in Qdrant
-                self.client.upsert(
-                    collection_name="git_files",
-                    points=[models.PointStruct(
-                        id=hash(blob.path),
-                        vector=vector.tolist(),
-                        payload={
-                            "context_name": context_name,
-                            "path": blob.path,
-                            "size": blob.size,
-                            "mime_type": blob.mime_type,
-                            "last_modified": datetime.fromtimestamp(blob.authored_date).isoformat()
-                        }
-                    )]
-                )
-            except UnicodeDecodeError:
+            mime_type = blob.mime_type
+            if mime_type.startswith(BINARY_MIME_PREFIXES) and mime_type not in TEXT_MIME_TYPES:
                 logger.warning(f"Skipping binary file: {blob.path}")
+                continue
+            
+            content = ""
+            if blob.size <= MAX_EMBED_SIZE:
+                raw = blob.data_stream.read(EMBED_READ_BYTES)
+                if b"\0" in raw:
+                    logger.warning(f"Skipping binary file: {blob.path}")
+                    continue
+                content = raw.decode('utf-8', errors='replace')[:EMBED_CONTENT_CHARS]
+            
+            # Create rich file text
+            texts.append(f"""
+            Path: {blob.path}
+            Content: {content}
+            """)
+            ids.append(self._point_id(context_name, blob.path))
+            payloads.append({
+                "context_name": context_name,
+                "path": blob.path,
+                "extension": Path(blob.path).suffix,
+                "size": blob.size,
+                "mime_type": blob.mime_type,
+                "last_modified": last_modified.get(blob.path)
+            })
+        
+        # Get file vectors and store in Qdrant
+        await self._upload(self._collection("git_files"), ids, self._encode_many(texts), payloads, batch_size, concurrency)
     
-    async def _process_authors(self, repo: Repo, context_name: str) -> None:
+    async def _process_authors(
+        self,
+        repo: Repo,
+        context_name: str,
+        batch_size: int = UPLOAD_BATCH_SIZE,
+        concurrency: int = 1
+    ) -> None:
         """Process and store author information."""
         authors: Dict[str, Dict] = {}
         
@@ -180,137 +426,160 @@ class GitContextBuilder:
                 commit.authored_datetime
             )
         
+        ids, texts, payloads = [], [], []
         for email, data in authors.items():
             # Create rich author text
-            author_text = f"""
+            texts.append(f"""
             Name: {data['name']}
             Email: {email}
             Files: {', '.join(data['file_patterns'])}
-            """
-            
-            # Get author vector
-            vector = self.model.encode(author_text)
-            
-            # Store in Qdrant
-            self.client.upsert(
-                collection_name="git_authors",
-                points=[models.PointStruct(
-                    id=hash(email),
-                    vector=vector.tolist(),
-                    payload={
-                        "context_name": context_name,
-                        "name": data["name"],
-                        "email": email,
-                        "commit_count": data["commit_count"],
-                        "file_patterns": list(data["file_patterns"]),
-                        "first_commit": data["first_commit"].isoformat(),
-                        "last_commit": data["last_commit"].isoformat()
-                    }
-                )]
-            )
+            """)
+            ids.append(self._point_id(context_name, email))
+            payloads.append({
+                "context_name": context_name,
+                "name": data["name"],
+                "email": email,
+                "commit_count": data["commit_count"],
+                "file_patterns": list(data["file_patterns"]),
+                "first_commit": data["first_commit"].isoformat(),
+                "last_commit": data["last_commit"].isoformat()
+            })
+        
+        # Get author vectors and store in Qdrant
+        await self._upload(self._collection("git_authors"), ids, self._encode_many(texts), payloads, batch_size, concurrency)
     
-    async def _build_relationships(self, context_name: str) -> None:
-        """Build relationships between different aspects of the context."""
-        # Find related commits (similar changes)
+    async def _link_similar_commits(
+        self,
+        context_name: str,
+        relationship_type: str,
+        commit_limit: int,
+        search_limit: int,
+        score_threshold: float,
+        id_prefix: str = ""
+    ) -> None:
+        """Batch-search similar commits in a context and store them as relationships."""
+        ctx_filter = self._context_filter(context_name)
         commits = self.client.scroll(
-            collection_name="git_commits",
-            scroll_filter=models.Filter(
-                must=[
-                    models.FieldCondition(
-                        key="context_name",
-                        match=models.MatchValue(value=context_name)
-                    )
-                ]
-            ),
-            limit=100
+            collection_name=self._collection("git_commits"),
+            scroll_filter=ctx_filter,
+            # Only ids and vectors are needed to seed the searches
+            with_payload=False,
+            with_vectors=True,
+            limit=commit_limit
         )[0]
         
-        for commit in commits:
-            similar = self.client.search(
-                collection_name="git_commits",
-                query_vector=commit.vector,
-                limit=5,
-                score_threshold=0.8
-            )
-            
-            for match in similar:
+        if not commits:
+            return
+        
+        # One round-trip for every commit instead of one search per commit
+        results = self.client.query_batch_points(
+            collection_name=self._collection("git_commits"),
+            requests=[
+                models.QueryRequest(
+                    query=commit.vector,
+                    filter=ctx_filter,
+                    limit=search_limit,
+                    score_threshold=score_threshold,
+                    with_payload=False,
+                    with_vector=True
+                )
+                for commit in commits
+            ]
+        )
+        
+        source_idx = []
+        matches = []
+        for i, (commit, similar) in enumerate(zip(commits, results)):
+            for match in similar.points:
                 if match.id != commit.id:
-                    # Store relationship
-                    self.client.upsert(
-                        collection_name="git_relationships",
-                        points=[models.PointStruct(
-                            id=hash(f"{commit.id}-{match.id}"),
-                            vector=np.mean([commit.vector, match.vector], axis=0).tolist(),
-                            payload={
-                                "context_name": context_name,
-                                "type": "similar_commits",
-                                "source_id": str(commit.id),
-                                "target_id": str(match.id),
-                                "similarity": match.score
-                            }
-                        )]
-                    )
+                    source_idx.append(i)
+                    matches.append(match)
+        
+        if not matches:
+            return
+        
+        # Compute every pair midpoint in one vectorized step
+        commit_vectors = np.asarray([c.vector for c in commits], dtype=np.float32)
+        match_vectors = np.asarray([m.vector for m in matches], dtype=np.float32)
+        midpoints = 0.5 * (commit_vectors[source_idx] + match_vectors)
+        
+        await self._upload(
+            self._collection("git_relationships"),
+            ids=[
+                self._point_id(context_name, f"{id_prefix}{commits[i].id}-{match.id}")
+                for i, match in zip(source_idx, matches)
+            ],
+            vectors=midpoints,
+            payloads=[
+                {
+                    "context_name": context_name,
+                    "type": relationship_type,
+                    "source_id": str(commits[i].id),
+                    "target_id": str(match.id),
+                    "similarity": match.score
+                }
+                for i, match in zip(source_idx, matches)
+            ]
+        )
+    
+    async def _build_relationships(self, context_name: str) -> None:
+        """Build relationships between different aspects of the context."""
+        # Find related commits (similar changes)
+        await self._link_similar_commits(
+            context_name,
+            relationship_type="similar_commits",
+            commit_limit=100,
+            search_limit=5,
+            score_threshold=0.8
+        )
     
     async def build_multi_repo_relationships(self, context_name: str) -> None:
         """Build relationships between multiple repositories in a context."""
-        # Find all commits in the context
-        commits = self.client.scroll(
-            collection_name="git_commits",
-            scroll_filter=models.Filter(
-                must=[
-                    models.FieldCondition(
-                        key="context_name",
-                        match=models.MatchValue(value=context_name)
-                    )
-                ]
-            ),
-            limit=1000
-        )[0]
-        
         # Find similar commits across repositories
-        for commit in commits:
-            similar = self.client.search(
-                collection_name="git_commits",
-                query_vector=commit.vector,
-                limit=10,
-                score_threshold=0.85
-            )
-            
-            for match in similar:
-                if match.id != commit.id:
-                    # Store cross-repo relationship
-                    self.client.upsert(
-                        collection_name="git_relationships",
-                        points=[models.PointStruct(
-                            id=hash(f"cross-{commit.id}-{match.id}"),
-                            vector=np.mean([commit.vector, match.vector], axis=0).tolist(),
-                            payload={
-                                "context_name": context_name,
-                                "type": "cross_repo_similarity",
-                                "source_id": str(commit.id),
-                                "target_id": str(match.id),
-                                "similarity": match.score
-                            }
-                        )]
-                    )
+        await self._link_similar_commits(
+            context_name,
+            relationship_type="cross_repo_similarity",
+            commit_limit=1000,
+            search_limit=10,
+            score_threshold=0.85,
+            id_prefix="cross-"
+        )
     
     async def list_contexts(self) -> Set[str]:
         """List all available contexts."""
-        contexts = set()
-        
-        # Get contexts from all collections
-        for collection in ["git_commits", "git_files", "git_authors", "git_relationships"]:
-            results = self.client.scroll(
-                collection_name=collection,
-                limit=1000
-            )[0]
-            
-            contexts.update(r.payload.get("context_name") for r in results)
+        collections = ["git_commits", "git_files", "git_authors", "git_relationships"]
+        
+        # Page through all collections concurrently, fetching only context names
+        results = await asyncio.gather(*(
+            asyncio.to_thread(self._scroll_payloads, self._collection(collection), None, ["context_name"])
+            for collection in collections
+        ))
         
-        return contexts
+        return {
+            payload.get("context_name")
+            for payloads in results
+            for payload in payloads
+        }
     
     async def analyze_context(self, context_name: str) -> Dict:
         """Analyze a context and return insights."""
+        ctx_filter = self._context_filter(context_name)
+        
+        # Point counts are cheap indexed lookups; reuse the last analysis
+        # while none of them has changed
+        commit_total, file_total, relationship_total = (
+            self.client.count(
+                collection_name=self._collection(collection),
+                count_filter=ctx_filter,
+                exact=True
+            ).count
+            for collection in ("git_commits", "git_files", "git_relationships")
+        )
+        signature = (context_name, commit_total, file_total, relationship_total)
+        if signature in self._analysis_cache:
+            self._analysis_cache.move_to_end(signature)
+            return copy.deepcopy(self._analysis_cache[signature])
+        
         analysis = {
             "commits": {
                 "total": 0,
@@ -335,72 +604,70 @@ class GitContextBuilder:
         }
         
         # Analyze commits
-        commits = self.client.scroll(
-            collection_name="git_commits",
-            scroll_filter=models.Filter(
-                must=[
-                    models.FieldCondition(
-                        key="context_name",
-                        match=models.MatchValue(value=context_name)
-                    )
-                ]
-            ),
-            limit=1000
-        )[0]
+        analysis["commits"]["total"] = commit_total
         
-        for commit in commits:
-            analysis["commits"]["total"] += 1
-            analysis["commits"]["authors"].add(commit.payload["author_email"])
-            
-            # Analyze busy times
-            hour = datetime.fromisoformat(commit.payload["timestamp"]).hour
-            analysis["commits"]["busy_times"][hour] = analysis["commits"]["busy_times"].get(hour, 0) + 1
+        authors = self.client.facet(
+            collection_name=self._collection("git_commits"),
+            key="author_email",
+            facet_filter=ctx_filter,
+            limit=analysis["commits"]["total"] or 1,
+            exact=True
+        )
+        analysis["commits"]["authors"].update(hit.value for hit in authors.hits)
+        
+        # Analyze busy times
+        busy_times = self.client.facet(
+            collection_name=self._collection("git_commits"),
+            key="hour",
+            facet_filter=ctx_filter,
+            limit=24,
+            exact=True
+        )
+        analysis["commits"]["busy_times"] = {hit.value: hit.count for hit in busy_times.hits}
         
         # Analyze files
-        files = self.client.scroll(
-            collection_name="git_files",
-            scroll_filter=models.Filter(
-                must=[
-                    models.FieldCondition(
-                        key="context_name",
-                        match=models.MatchValue(value=context_name)
-                    )
-                ]
-            ),
-            limit=1000
-        )[0]
+        analysis["files"]["total"] = file_total
         
-        for file in files:
-            analysis["files"]["total"] += 1
-            ext = Path(file.payload["path"]).suffix
-            analysis["files"]["types"][ext] = analysis["files"]["types"].get(ext, 0) + 1
-            
-            if not analysis["files"]["largest"] or file.payload["size"] > analysis["files"]["largest"]["size"]:
-                analysis["files"]["largest"] = {
-                    "path": file.payload["path"],
-                    "size": file.payload["size"]
-                }
+        file_types = self.client.facet(
+            collection_name=self._collection("git_files"),
+            key="extension",
+            facet_filter=ctx_filter,
+            limit=file_total or 1,
+            exact=True
+        )
+        analysis["files"]["types"] = {hit.value: hit.count for hit in file_types.hits}
+        
+        largest, _ = self.client.scroll(
+            collection_name=self._collection("git_files"),
+            scroll_filter=ctx_filter,
+            order_by=models.OrderBy(key="size", direction=models.Direction.DESC),
+            with_payload=["path", "size"],
+            with_vectors=False,
+            limit=1
+        )
+        if largest:
+            analysis["files"]["largest"] = {
+                "path": largest[0].payload["path"],
+                "size": largest[0].payload["size"]
+            }
         
         # Analyze relationships
-        relationships = self.client.scroll(
-            collection_name="git_relationships",
-            scroll_filter=models.Filter(
-                must=[
-                    models.FieldCondition(
-                        key="context_name",
-                        match=models.MatchValue(value=context_name)
-                    )
-                ]
-            ),
-            limit=1000
-        )[0]
+        relationship_types = self.client.facet(
+            collection_name=self._collection("git_relationships"),
+            key="type",
+            facet_filter=ctx_filter,
+            exact=True
+        )
         
-        for rel in relationships:
-            if rel.payload["type"] == "similar_commits":
-                analysis["relationships"]["similar_commits"] += 1
-            elif rel.payload["type"] == "cross_repo_similarity":
-                analysis["relationships"]["cross_repo"] += 1
+        for hit in relationship_types.hits:
+            if hit.value == "similar_commits":
+                analysis["relationships"]["similar_commits"] = hit.count
+            elif hit.value == "cross_repo_similarity":
+                analysis["relationships"]["cross_repo"] = hit.count
         
+        self._analysis_cache[signature] = copy.deepcopy(analysis)
+        if len(self._analysis_cache) > ANALYSIS_CACHE_SIZE:
+            self._analysis_cache.popitem(last=False)
         return analysis
 
 async def main():
@@ -411,9 +678,10 @@ async def main():
     parser.add_argument("--build-relationships", action="store_true", help="Build relationships between repos")
     parser.add_argument("--list-contexts", action="store_true", help="List available contexts")
     parser.add_argument("--analyze", action="store_true", help="Analyze a context")
+    parser.add_argument("--grpc", action="store_true", help="Talk to Qdrant over gRPC (port 6334)")
     
     args = parser.parse_args()
-    builder = GitContextBuilder()
+    builder = GitContextBuilder(prefer_grpc=args.grpc)
     
     if args.list_contexts:
         contexts = await builder.list_contexts()
@@ -5,51 +5,134 @@ Git Context Visualizer using Gradio
 Provides an interactive interface for visualizing Git context data
 """
 
-import gradio as gr
+import asyncio
+import functools
 import git
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
 import pandas as pd
-import networkx as nx
 from pathlib import Path
-import json
 from collections import Counter
 import numpy as np
 
+# gradio and plotly are imported where used so analysis-only callers
+# don't pay their import time
+__all__ = ['GitContextVisualizer', 'create_gradio_interface']
+
+# Above this many commits the timeline is downsampled before plotting
+TIMELINE_MAX_POINTS = 5000
+
+def _lttb_indices(x, y, threshold):
+    """Pick indices of `threshold` points that keep the visual shape of (x, y) (LTTB)"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    indices = np.empty(threshold, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        # Keep the point forming the largest triangle with the previous pick
+        # and the average of the next bucket
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        indices[i + 1] = a
+    return indices
+
+def _memoized_figure(method):
+    """Reuse a built figure until the repository HEAD moves"""
+    @functools.wraps(method)
+    def wrapper(self):
+        self._check_head()
+        figs = self.cache.setdefault('figs', {})
+        if method.__name__ not in figs:
+            figs[method.__name__] = method(self)
+        return figs[method.__name__]
+    return wrapper
+
 class GitContextVisualizer:
     def __init__(self, repo_path="."):
         self.repo = git.Repo(repo_path)
         self.cache = {}
+        self._head_sha = self.repo.head.commit.hexsha
+    
+    def _check_head(self):
+        """Drop cached data and figures if HEAD changed since they were built"""
+        head_sha = self.repo.head.commit.hexsha
+        if head_sha != self._head_sha:
+            self._head_sha = head_sha
+            self.cache.clear()
+    
+    async def refresh(self):
+        """Return all figures, rebuilding only if the repository changed"""
+        # Gradio awaits this on its own loop; git and plotly work stays off it
+        return await asyncio.to_thread(self._all_figures)
+    
+    def _all_figures(self):
+        """Build (or reuse) every figure in display order"""
+        return [
+            self.create_commit_timeline(),
+            self.create_author_stats(),
+            self.create_file_type_chart()
+        ]
     
     def get_commit_history(self):
         """Get commit history as a pandas DataFrame"""
         if 'commits' not in self.cache:
-            commits = []
-            for commit in self.repo.iter_commits():
-                commits.append({
-                    'hash': commit.hexsha[:7],
-                    'message': commit.message.strip(),
-                    'author': commit.author.name,
-                    'date': commit.committed_datetime,
-                    'files_changed': len(commit.stats.files)
-                })
-            self.cache['commits'] = pd.DataFrame(commits)
+            # One `git log` for the whole history instead of a diff per commit
+            raw = self.repo.git.log(
+                "--pretty=format:%x1e%H%x1f%an%x1f%cI%x1f%B%x1f",
+                "--numstat",
+                "--no-renames",
+                "--diff-merges=first-parent"
+            )
+            records = [r.split('\x1f', 4) for r in raw.split('\x1e') if r]
+            df = pd.DataFrame(records, columns=['hash', 'author', 'date', 'message', 'numstat'])
+            
+            # Column-wise string ops and ISO parsing instead of per-row Python
+            df['hash'] = df['hash'].str[:7]
+            df['message'] = df['message'].str.strip()
+            df['date'] = pd.to_datetime(df['date'], utc=True, format='ISO8601')
+            df['files_changed'] = df['numstat'].str.count(r'(?m)^.+$')
+            self.cache['commits'] = df[['hash', 'message', 'author', 'date', 'files_changed']]
         return self.cache['commits']
     
+    @_memoized_figure
     def create_commit_timeline(self):
         """Create an interactive timeline of commits"""
+        import plotly.express as px
+        
         df = self.get_commit_history()
+        title = 'Commit Timeline'
+        if len(df) > TIMELINE_MAX_POINTS:
+            df = df.sort_values('date')
+            keep = _lttb_indices(
+                df['date'].astype('int64').to_numpy(dtype=np.float64),
+                df['files_changed'].to_numpy(dtype=np.float64),
+                TIMELINE_MAX_POINTS
+            )
+            df = df.iloc[keep]
+            title = f'Commit Timeline ({len(df)} of {len(self.get_commit_history())} commits shown)'
+        
+        # WebGL keeps large scatters responsive where SVG stalls
         fig = px.scatter(df, x='date', y='files_changed',
                         hover_data=['hash', 'message', 'author'],
-                        title='Commit Timeline',
+                        title=title,
                         labels={'date': 'Date', 'files_changed': 'Files Changed'},
-                        color='author')
+                        color='author',
+                        render_mode='webgl')
         fig.update_layout(height=500)
         return fig
 
+    @_memoized_figure
     def create_author_stats(self):
         """Create author contribution statistics"""
+        import plotly.graph_objects as go
+        
         df = self.get_commit_history()
         author_stats = df.groupby('author').agg({
             'hash': 'count',
@@ -68,10 +151,18 @@ class GitContextVisualizer:
         )
         return fig
 
+    @_memoized_figure
     def create_file_type_chart(self):
         """Create a pie chart of file types"""
-        files = list(Path('.').rglob('*'))
-        extensions = Counter(f.suffix for f in files if f.suffix)
+        import plotly.express as px
+        
+        if 'filetypes' not in self.cache:
+            # Only tracked files, so .git/ and ignored trees are never walked
+            tracked = self.repo.git.ls_files(z=True).split('\x00')
+            self.cache['filetypes'] = Counter(
+                suffix for suffix in (Path(p).suffix for p in tracked if p) if suffix
+            )
+        extensions = self.cache['filetypes']
         
         fig = px.pie(
             values=list(extensions.values()),
@@ -83,6 +174,8 @@ class GitContextVisualizer:
 
 def create_gradio_interface():
     """Create the Gradio interface"""
+    import gradio as gr
+    
     visualizer = GitContextVisualizer()
     
     with gr.Blocks(title="Git Context Visualizer", theme=gr.themes.Soft()) as interface:
@@ -103,11 +196,7 @@ def create_gradio_interface():
         
         refresh_btn = gr.Button("🔄 Refresh Visualizations")
         refresh_btn.click(
-            fn=lambda: [
-                visualizer.create_commit_timeline(),
-                visualizer.create_author_stats(),
-                visualizer.create_file_type_chart()
-            ],
+            fn=visualizer.refresh,
             outputs=[timeline_plot, author_plot, filetype_plot]
         )
         
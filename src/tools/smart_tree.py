@@ -1,12 +1,39 @@
 #!/usr/bin/env python3
 
+import ast
+import functools
+import mmap
 import os
 import stat
 import json
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
 from pathlib import Path
-from typing import Dict, List, Set, Optional
+from typing import Dict, List, Set, Optional, Tuple
 from dataclasses import dataclass, field
 
+import ahocorasick
+import pathspec
+
+# Files with a NUL byte in this prefix are treated as binary
+BINARY_SNIFF_BYTES = 4096
+# Larger files are memory-mapped instead of copied into a bytes object
+MMAP_THRESHOLD = 64 * 1024
+# Depth columns pre-rendered for typical tree depths
+DEPTH_CACHE_SIZE = 64
+# Always skipped, whatever .gitignore says
+DEFAULT_IGNORE_PATTERNS = ['.git/']
+
+FILE_TYPE_EMOJI = {
+    stat.S_IFDIR: "📁",
+    stat.S_IFLNK: "🔗",
+    stat.S_IFSOCK: "🔌",
+    stat.S_IFIFO: "📝",
+    stat.S_IFBLK: "💾",
+    stat.S_IFCHR: "📺",
+}
+
 @dataclass
 class FileNode:
     """Represents a file or directory in the tree with additional context"""
@@ -17,6 +44,13 @@ class FileNode:
     referenced_by: Set[Path] = field(default_factory=set)
     imports: Set[str] = field(default_factory=set)
     imported_by: Set[Path] = field(default_factory=set)
+    name: str = ''
+    hex_fields: str = ''
+    emoji: str = ''
+
+    def __post_init__(self):
+        if not self.name:
+            self.name = self.path.name
 
 class SmartTree:
     COLORS = {
@@ -31,9 +65,29 @@ class SmartTree:
     def __init__(self, root_path: str, display_mode: str = 'classic', use_color: bool = True):
         self.root = Path(root_path).resolve()
         self.nodes: Dict[Path, FileNode] = {}
+        self._children: Dict[Path, List[Path]] = {}
+        self._root_node: Optional[FileNode] = None
         self.gitignore_patterns = self._load_gitignore()
+        # Inside a git work tree, git itself decides what is ignored
+        self._git_paths = self._load_git_paths()
+        # Compiled once; matching is a single regex pass per path
+        self._ignore_match = pathspec.GitIgnoreSpec.from_lines(
+            DEFAULT_IGNORE_PATTERNS + self.gitignore_patterns
+        ).match_file
         self.display_mode = display_mode
         self.use_color = use_color
+        # Per-node hex columns are rendered once in build(); only depth varies
+        if use_color:
+            c = self.COLORS
+            self._depth_template = f"{c['depth']}{{:x}}{c['reset']} "
+            self._hex_template = (f"{c['perm']}{{:03x}}{c['reset']} "
+                                  f"{c['id']}{{:x}} {{:x}}{c['reset']} "
+                                  f"{c['size']}{{:x}}{c['reset']} "
+                                  f"{c['time']}{{:x}}{c['reset']}")
+        else:
+            self._depth_template = "{:x} "
+            self._hex_template = "{:03x} {:x} {:x} {:x} {:x}"
+        self._depth_hex = [self._depth_template.format(d) for d in range(DEPTH_CACHE_SIZE)]
         
     def _load_gitignore(self) -> List[str]:
         """Load .gitignore patterns if present"""
@@ -44,111 +98,182 @@ class SmartTree:
         with open(gitignore_path) as f:
             return [line.strip() for line in f if line.strip() and not line.startswith('#')]
 
-    def _should_ignore(self, path: Path) -> bool:
-        """Check if path should be ignored based on .gitignore patterns"""
-        rel_path = str(path.relative_to(self.root))
-        return any(
-            rel_path.startswith(pattern.rstrip('/')) or 
-            rel_path.endswith(pattern.lstrip('/'))
-            for pattern in self.gitignore_patterns
-        )
+    def _load_git_paths(self) -> Optional[frozenset]:
+        """Collect every tracked or non-ignored file under root, plus their parent directories.
+
+        git does not list empty directories, so unlike the pathspec fallback
+        they are left out of the tree in git mode. Returns None, selecting the
+        fallback, outside a work tree or when git lists nothing under root
+        (e.g. an ignored `build/` or `node_modules/` used as the root).
+        """
+        try:
+            out = subprocess.run(
+                ['git', '-C', str(self.root), 'ls-files', '-z',
+                 '--cached', '--others', '--exclude-standard'],
+                capture_output=True, check=True
+            ).stdout
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        if not out:
+            return None
+
+        paths = set()
+        for rel_path in os.fsdecode(out).split('\0'):
+            # Parents are added until one is already known
+            while rel_path and rel_path not in paths:
+                paths.add(rel_path)
+                rel_path = rel_path.rpartition('/')[0]
+        return frozenset(paths)
+
+    def _should_ignore(self, rel_path: str, is_dir: bool = False) -> bool:
+        """Check if a root-relative posix path should be ignored based on .gitignore patterns"""
+        if self._git_paths is not None:
+            return rel_path not in self._git_paths
+        # Directory-only patterns such as `build/` need the trailing slash
+        return self._ignore_match(rel_path + '/' if is_dir else rel_path)
 
-    def _find_python_imports(self, file_path: Path) -> Set[str]:
-        """Extract Python imports from a file"""
-        if not str(file_path).endswith('.py'):
+    def _find_python_imports(self, rel_path: Path, content: str) -> Set[str]:
+        """Extract the modules a Python file imports at top level"""
+        if rel_path.suffix != '.py':
             return set()
 
-        imports = set()
         try:
-            with open(file_path) as f:
-                for line in f:
-                    line = line.strip()
-                    if line.startswith(('import ', 'from ')):
-                        imports.add(line)
-        except Exception:
-            pass
+            tree = ast.parse(content, filename=str(rel_path))
+        except (SyntaxError, ValueError):
+            return set()
+        
+        imports = set()
+        for node in tree.body:
+            if isinstance(node, ast.Import):
+                imports.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                imports.add('.' * node.level + (node.module or ''))
         return imports
 
-    def _scan_file_references(self, file_path: Path, content: str):
-        """Scan file content for references to other files"""
-        rel_path = file_path.relative_to(self.root)
-        node = self.nodes[rel_path]
+    def _build_path_automaton(self) -> ahocorasick.Automaton:
+        """Compile every known path into a single Aho-Corasick automaton"""
+        automaton = ahocorasick.Automaton()
+        for path in self.nodes:
+            automaton.add_word(str(path), path)
+        automaton.make_automaton()
+        return automaton
+
+    def _scan_file_references(self, rel_path: Path, content: str, automaton: ahocorasick.Automaton) -> Set[Path]:
+        """Scan file content for references to other files in one pass"""
+        return {
+            other_path
+            for _, other_path in automaton.iter(content)
+            if other_path != rel_path
+        }
+
+    def _analyze_file(
+        self, rel_path: Path, automaton: ahocorasick.Automaton
+    ) -> Optional[Tuple[Path, Set[str], Set[Path]]]:
+        """Read a file and collect its imports and references to other files"""
+        try:
+            with open(self.root / rel_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size > MMAP_THRESHOLD:
+                    buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    buf = f.read()
+        except (OSError, ValueError):
+            return None
         
-        # Look for file path strings in content
-        for other_path in self.nodes:
-            if str(other_path) in content:
-                node.references.add(other_path)
-                self.nodes[other_path].referenced_by.add(rel_path)
+        try:
+            if b'\0' in buf[:BINARY_SNIFF_BYTES]:
+                return None
+            # Decodes straight from the page cache when buf is a mapping
+            content = str(buf, 'utf-8', 'replace')
+        finally:
+            if isinstance(buf, mmap.mmap):
+                buf.close()
+        
+        imports = self._find_python_imports(rel_path, content)
+        references = self._scan_file_references(rel_path, content, automaton)
+        return rel_path, imports, references
 
-    def _get_file_emoji(self, mode):
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _get_file_emoji(mode):
         """Get appropriate emoji for file type"""
-        if stat.S_ISDIR(mode): return "📁"
-        elif stat.S_ISLNK(mode): return "🔗"
-        elif mode & stat.S_IXUSR: return "⚙️"
-        elif stat.S_ISSOCK(mode): return "🔌"
-        elif stat.S_ISFIFO(mode): return "📝"
-        elif stat.S_ISBLK(mode): return "💾"
-        elif stat.S_ISCHR(mode): return "📺"
-        else: return "📄"
+        file_type = stat.S_IFMT(mode)
+        if file_type not in (stat.S_IFDIR, stat.S_IFLNK) and mode & stat.S_IXUSR:
+            return "⚙️"
+        return FILE_TYPE_EMOJI.get(file_type, "📄")
+
+    def _make_node(self, path: Path, is_dir: bool, stat_info: os.stat_result, name: str = '') -> FileNode:
+        """Create a node with its display columns rendered up front"""
+        return FileNode(
+            path, is_dir, stat_info,
+            name=name,
+            hex_fields=self._hex_template.format(
+                stat_info.st_mode & 0o777,
+                stat_info.st_uid,
+                stat_info.st_gid,
+                stat_info.st_size,
+                int(stat_info.st_mtime)
+            ),
+            emoji=self._get_file_emoji(stat_info.st_mode)
+        )
 
     def build(self):
         """Build the smart tree structure"""
-        # First pass: collect all files and directories
-        for root, dirs, files in os.walk(self.root):
-            root_path = Path(root).relative_to(self.root)
-            
-            # Add directories
-            if root_path != Path('.'):
-                if not self._should_ignore(self.root / root_path):
-                    stat_info = (self.root / root_path).stat()
-                    self.nodes[root_path] = FileNode(root_path, True, stat_info)
-
-            # Add files
-            for file in files:
-                file_path = root_path / file
-                if not self._should_ignore(self.root / file_path):
-                    stat_info = (self.root / file_path).stat()
-                    self.nodes[file_path] = FileNode(file_path, False, stat_info)
+        self._root_node = self._make_node(Path('.'), True, self.root.stat(), self.root.name)
+        # First pass: collect all files and directories in one scandir walk,
+        # reusing the stat data each DirEntry already carries
+        root = str(self.root)
+        prefix_len = len(os.path.join(root, ''))
+        stack = [root]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.name == '.git':
+                        continue
+                    # Ignore rules and git output use '/' on every platform
+                    rel_path = entry.path[prefix_len:].replace(os.sep, '/')
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if self._should_ignore(rel_path, is_dir):
+                        continue
+                    
+                    path = Path(rel_path)
+                    self.nodes[path] = self._make_node(path, is_dir, entry.stat(follow_symlinks=False))
+                    if is_dir:
+                        stack.append(entry.path)
+
+        # Index children once so display never rescans all nodes per directory
+        self._children = {}
+        for path in self.nodes:
+            self._children.setdefault(path.parent, []).append(path)
+        for children in self._children.values():
+            children.sort()
 
         # Second pass: analyze relationships
-        for path, node in self.nodes.items():
-            if not node.is_dir:
-                try:
-                    with open(self.root / path) as f:
-                        content = f.read()
-                        node.imports = self._find_python_imports(self.root / path)
-                        self._scan_file_references(path, content)
-                except Exception:
-                    pass
-
-    def _format_hex_node(self, path: Path, depth: int = 0) -> str:
-        """Format a node in hex format with all metadata"""
-        node = self.nodes[path]
-        stat_info = node.stat_info
+        if not self.nodes:
+            return
+        automaton = self._build_path_automaton()
+        files = [path for path, node in self.nodes.items() if not node.is_dir]
         
-        # Convert values to hex
-        perms_hex = f"{stat_info.st_mode & 0o777:03x}"
-        uid_hex = f"{stat_info.st_uid:x}"
-        gid_hex = f"{stat_info.st_gid:x}"
-        size_hex = f"{stat_info.st_size:x}"
-        time_hex = f"{int(stat_info.st_mtime):x}"
-        depth_hex = f"{depth:x}"
-        
-        emoji = self._get_file_emoji(stat_info.st_mode)
+        # Reads release the GIL, so threads overlap the disk I/O; results are
+        # merged here so workers never touch self.nodes
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 4) * 4)) as executor:
+            for result in executor.map(lambda p: self._analyze_file(p, automaton), files):
+                if result is None:
+                    continue
+                path, imports, references = result
+                self.nodes[path].imports = imports
+                self.nodes[path].references = references
+                for other_path in references:
+                    self.nodes[other_path].referenced_by.add(path)
+
+    def _format_hex_node(self, node: FileNode, depth: int = 0) -> str:
+        """Format a node in hex format with all metadata"""
+        depth_hex = self._depth_hex[depth] if depth < DEPTH_CACHE_SIZE else self._depth_template.format(depth)
         
         refs = ""
         if node.references:
             refs = f" → {', '.join(str(r) for r in sorted(node.references))}"
         
-        if self.use_color:
-            return (f"{self.COLORS['depth']}{depth_hex}{self.COLORS['reset']} "
-                   f"{self.COLORS['perm']}{perms_hex}{self.COLORS['reset']} "
-                   f"{self.COLORS['id']}{uid_hex} {gid_hex}{self.COLORS['reset']} "
-                   f"{self.COLORS['size']}{size_hex}{self.COLORS['reset']} "
-                   f"{self.COLORS['time']}{time_hex}{self.COLORS['reset']} "
-                   f"{emoji} {path.name}{refs}")
-        else:
-            return f"{depth_hex} {perms_hex} {uid_hex} {gid_hex} {size_hex} {time_hex} {emoji} {path.name}{refs}"
+        return f"{depth_hex}{node.hex_fields} {node.emoji} {node.name}{refs}"
 
     def _format_node(self, path: Path, prefix: str = "", is_last: bool = True) -> List[str]:
         """Format a node for display with its relationships"""
@@ -156,7 +281,7 @@ class SmartTree:
         current_prefix = "└── " if is_last else "├── "
         next_prefix = "    " if is_last else "│   "
         
-        lines = [f"{prefix}{current_prefix}{path.name}"]
+        lines = [f"{prefix}{current_prefix}{node.name}"]
         
         # Add relationship information if any exists
         if node.references:
@@ -176,31 +301,27 @@ class SmartTree:
                 
         return lines
 
-    def _display_hex(self, path: Optional[Path] = None, depth: int = 0) -> str:
+    def _display_hex(self, path: Optional[Path] = None) -> str:
         """Display the tree in hex format"""
+        out = StringIO()
         if path is None:
             path = Path('.')
-            
-        result = []
-        if path == Path('.'):
-            root_stat = self.root.stat()
-            result.append(self._format_hex_node(path, depth))
-            
-        # Get all immediate children
-        children = sorted([
-            p for p in self.nodes.keys()
-            if p.parent == path and p != path
-        ])
-        
-        # Display each child
-        for child in children:
-            result.append(self._format_hex_node(child, depth + 1))
+            out.write(self._format_hex_node(self._root_node, 0))
+            out.write('\n')
+        self._write_hex(path, 0, out)
+        return out.getvalue().rstrip('\n')
+
+    def _write_hex(self, path: Path, depth: int, out: StringIO):
+        """Write the hex lines for everything below path into out"""
+        # Display each immediate child
+        for child in self._children.get(path, ()):
+            node = self.nodes[child]
+            out.write(self._format_hex_node(node, depth + 1))
+            out.write('\n')
             
             # Recurse into directories
-            if self.nodes[child].is_dir:
-                result.extend(self._display_hex(child, depth + 1))
-                
-        return "\n".join(result)
+            if node.is_dir:
+                self._write_hex(child, depth + 1, out)
 
     def display(self, path: Optional[Path] = None, prefix: str = "") -> str:
         """Display the smart tree in selected format"""
@@ -210,31 +331,30 @@ class SmartTree:
 
     def _display_classic(self, path: Optional[Path] = None, prefix: str = "") -> str:
         """Classic tree display format"""
+        out = StringIO()
         if path is None:
             path = Path('.')
-            
-        result = []
-        if path == Path('.'):
-            result.append(self.root.name)
+            out.write(self.root.name)
+            out.write('\n')
             prefix = ""
-        
-        # Get all immediate children
-        children = sorted([
-            p for p in self.nodes.keys()
-            if p.parent == path and p != path
-        ])
+        self._write_classic(path, prefix, out)
+        return out.getvalue().rstrip('\n')
+
+    def _write_classic(self, path: Path, prefix: str, out: StringIO):
+        """Write the classic tree lines for everything below path into out"""
+        children = self._children.get(path, ())
         
         # Display each child
         for i, child in enumerate(children):
             is_last = (i == len(children) - 1)
-            result.extend(self._format_node(child, prefix, is_last))
+            for line in self._format_node(child, prefix, is_last):
+                out.write(line)
+                out.write('\n')
             
             # Recurse into directories
             if self.nodes[child].is_dir:
                 next_prefix = prefix + ("    " if is_last else "│   ")
-                result.extend(self._display_classic(child, next_prefix))
-                
-        return "\n".join(result)
+                self._write_classic(child, next_prefix, out)
 
 def main():
     """Main entry point"""
@@ -5,6 +5,7 @@ Test configuration and fixtures.
 Tri says: Good tests are like good accounting - everything needs to balance! ⚖️
 """
 
+import asyncio
 import os
 import sys
 from pathlib import Path
@@ -14,9 +15,37 @@ src_path = str(Path(__file__).parent.parent)
 if src_path not in sys.path:
     sys.path.insert(0, src_path)
 
+# Run the async tests on uvloop where it is available
+if sys.platform != "win32":
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
 # Import our test fixtures
 import pytest
-from typing import Dict, Any
+import tempfile
+from typing import Dict, Any, Optional
+
+@pytest.fixture(scope="session")
+def qdrant_location() -> Optional[str]:
+    """In-process Qdrant unless PYTEST_INTEGRATION=1 asks for the real server"""
+    if os.environ.get("PYTEST_INTEGRATION") == "1":
+        return None
+    return ":memory:"
+
+# Memory-backed tmpfs, where available, for the throwaway git repositories
+RAM_TMPDIR = "/dev/shm"
+
+@pytest.fixture(scope="session", autouse=True)
+def _ram_tmpdir():
+    """Point temporary files at tmpfs so test git writes never touch disk"""
+    if not os.path.isdir(RAM_TMPDIR) or not os.access(RAM_TMPDIR, os.W_OK):
+        yield
+        return
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("TMPDIR", RAM_TMPDIR)
+        # gettempdir() caches its answer, so reset it as well
+        mp.setattr(tempfile, "tempdir", RAM_TMPDIR)
+        yield
 
 @pytest.fixture
 def mock_context_data() -> Dict[str, Any]:
@@ -1,6 +1,6 @@
 import pytest
-from datetime import datetime
 import asyncio
+import json
 from src.core.tof_system import (
     ToFManager,
     Context,
@@ -8,62 +8,84 @@ from src.core.tof_system import (
     ValidationResult
 )
 
+# Fixed timestamps keep the data identical from run to run
+_TIMESTAMP = "2024-01-01T00:00:00"
+
+_TEST_CONTEXT_DATA = {
+    "test_name": "sample_test",
+    "test_result": "passed",
+    "timestamp": _TIMESTAMP
+}
+
+_TOOL_CONTEXT_DATA = {
+    "tool_name": "sample_tool",
+    "tool_state": "ready",
+    "last_execution": _TIMESTAMP
+}
+
+_INVALID_DATA = {"invalid": "data"}
+
+def _canonical(data: dict) -> str:
+    """Snapshot context data as key-sorted JSON for cheap equality checks.
+
+    No default=str: a value that isn't plain JSON raises instead of
+    comparing equal to its string form.
+    """
+    return json.dumps(data, sort_keys=True)
+
 # Fixtures
-@pytest.fixture
-async def tof_manager():
-    return ToFManager(qdrant_host="localhost", qdrant_port=6333)
+@pytest.fixture(scope="session")
+async def tof_manager(qdrant_location):
+    return ToFManager(
+        qdrant_host="localhost",
+        qdrant_port=6333,
+        prefer_grpc=True,
+        pool_size=100,
+        qdrant_location=qdrant_location
+    )
+
+@pytest.fixture(autouse=True)
+def _reset_tof(tof_manager: ToFManager):
+    """Give every test an empty manager while reusing its Qdrant client"""
+    yield
+    tof_manager.contexts.clear()
+    tof_manager.results.clear()
 
 @pytest.fixture
 def test_context_data():
-    return {
-        "test_name": "sample_test",
-        "test_result": "passed",
-        "timestamp": datetime.now().isoformat()
-    }
+    return dict(_TEST_CONTEXT_DATA)
 
 @pytest.fixture
 def tool_context_data():
-    return {
-        "tool_name": "sample_tool",
-        "tool_state": "ready",
-        "last_execution": datetime.now().isoformat()
-    }
+    return dict(_TOOL_CONTEXT_DATA)
 
-@pytest.fixture
-def memory_context_data():
-    return {
+# Per-type validation cases: context type -> (data, tags)
+VALIDATION_CASES = {
+    ContextType.MEMORY: ({
         "memory_type": "conversation",
         "content": "Important discussion about AI",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": _TIMESTAMP,
         "importance": 0.8
-    }
-
-@pytest.fixture
-def intention_context_data():
-    return {
+    }, ["important", "conversation"]),
+    ContextType.INTENTION: ({
         "actor": "AI Assistant",
         "intention": "help user with coding",
         "confidence": 0.9,
-        "timestamp": datetime.now().isoformat()
-    }
-
-@pytest.fixture
-def emotion_context_data():
-    return {
+        "timestamp": _TIMESTAMP
+    }, []),
+    ContextType.EMOTION: ({
         "emotion_type": "excitement",
         "intensity": 0.7,
         "trigger": "successful code execution",
-        "timestamp": datetime.now().isoformat()
-    }
-
-@pytest.fixture
-def learning_context_data():
-    return {
+        "timestamp": _TIMESTAMP
+    }, []),
+    ContextType.LEARNING: ({
         "topic": "context management",
         "progress": 0.6,
         "mastery_level": "intermediate",
-        "last_update": datetime.now().isoformat()
-    }
+        "last_update": _TIMESTAMP
+    }, []),
+}
 
 # Tests
 @pytest.mark.asyncio
@@ -85,49 +107,25 @@ async def test_context_registration_with_parent(tof_manager: ToFManager, test_co
     assert child.metadata.parent_id == parent.context_id
 
 @pytest.mark.asyncio
-async def test_memory_context_validation(tof_manager: ToFManager, memory_context_data: dict):
-    """Test if memory context validation works"""
-    context = await tof_manager.register_context(
-        "memory-123",
-        memory_context_data,
-        ContextType.MEMORY,
-        ["important", "conversation"]
-    )
-    result = await tof_manager.validate_context(context.context_id)
-    assert result.passed is True
-    assert context.metadata.validation_count == 1
-
-@pytest.mark.asyncio
-async def test_intention_context_validation(tof_manager: ToFManager, intention_context_data: dict):
-    """Test if intention context validation works"""
-    context = await tof_manager.register_context(
-        "intention-123",
-        intention_context_data,
-        ContextType.INTENTION
-    )
-    result = await tof_manager.validate_context(context.context_id)
-    assert result.passed is True
-    assert context.metadata.validation_count == 1
-
-@pytest.mark.asyncio
-async def test_emotion_context_validation(tof_manager: ToFManager, emotion_context_data: dict):
-    """Test if emotion context validation works"""
-    context = await tof_manager.register_context(
-        "emotion-123",
-        emotion_context_data,
-        ContextType.EMOTION
-    )
-    result = await tof_manager.validate_context(context.context_id)
-    assert result.passed is True
-    assert context.metadata.validation_count == 1
-
-@pytest.mark.asyncio
-async def test_learning_context_validation(tof_manager: ToFManager, learning_context_data: dict):
-    """Test if learning context validation works"""
+@pytest.mark.parametrize(
+    "context_type, data, tags",
+    [
+        pytest.param(context_type, data, tags, id=context_type.value.lower())
+        for context_type, (data, tags) in VALIDATION_CASES.items()
+    ]
+)
+async def test_context_type_validation(
+    tof_manager: ToFManager,
+    context_type: ContextType,
+    data: dict,
+    tags: list
+):
+    """Test if validation works for each context type"""
     context = await tof_manager.register_context(
-        "learning-123",
-        learning_context_data,
-        ContextType.LEARNING
+        f"{context_type.value.lower()}-123",
+        dict(data),
+        context_type,
+        list(tags)
     )
     result = await tof_manager.validate_context(context.context_id)
     assert result.passed is True
@@ -164,17 +162,17 @@ async def test_context_recovery_from_state(tof_manager: ToFManager, test_context
     
     # Create a valid state
     await tof_manager.validate_context(context.context_id)
-    original_data = context.data.copy()
+    original_data = _canonical(context.data)
     
     # Corrupt the context
-    context.data = {"invalid": "data"}
+    context.data = dict(_INVALID_DATA)
     result = await tof_manager.validate_context(context.context_id)
     assert result.passed is False
     
     # Recover
     recovered = await tof_manager.recover_context(context.context_id)
     assert recovered is not None
-    assert recovered.data == original_data
+    assert _canonical(recovered.data) == original_data
 
 @pytest.mark.asyncio
 async def test_similar_context_search(tof_manager: ToFManager, test_context_data: dict):
@@ -199,10 +197,10 @@ async def test_similar_context_search(tof_manager: ToFManager, test_context_data
     )
     
     # Corrupt original and try to recover
-    original.data = {"invalid": "data"}
+    original.data = dict(_INVALID_DATA)
     recovered = await tof_manager.recover_context(original.context_id)
     assert recovered is not None
-    assert recovered.data != {"invalid": "data"}
+    assert _canonical(recovered.data) != _canonical(_INVALID_DATA)
 
 @pytest.mark.asyncio
 async def test_context_version_tracking(tof_manager: ToFManager, test_context_data: dict):
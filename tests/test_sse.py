@@ -1,13 +1,61 @@
 import pytest
+import pytest_asyncio
+import httpx
+import socket
+import uvicorn
 from fastapi.testclient import TestClient
+from mcp_atc.api import main
 from mcp_atc.api.main import app
 import asyncio
 import json
 from datetime import datetime, timedelta
 
-client = TestClient(app)
+@pytest.fixture(scope="module")
+def client():
+    """One TestClient shared by the synchronous tests in this module"""
+    return TestClient(app, backend="asyncio")
 
-def test_sse_connection():
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def sse_client():
+    """Serve the app on a local port and share one pooled httpx client.
+
+    SSE streams never finish, so they can't go through the in-process
+    transports, which wait for the whole response body.
+    """
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+    serve_task = asyncio.create_task(server.serve(sockets=[sock]))
+
+    async def wait_started():
+        while not server.started:
+            if serve_task.done():
+                # Surface the startup error instead of waiting forever
+                serve_task.result()
+                pytest.fail("uvicorn exited before it started serving")
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(wait_started(), timeout=10.0)
+
+    limits = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits) as client:
+        yield client
+
+    server.should_exit = True
+    await serve_task
+    sock.close()
+
+SSE_DATA_PREFIX = "data: "
+
+async def read_first_sse_event(response: httpx.Response) -> dict:
+    """Return the payload of the first data line on an SSE stream"""
+    async for line in response.aiter_lines():
+        if line.startswith(SSE_DATA_PREFIX):
+            # Strip only the field prefix; the payload may itself contain "data: "
+            return json.loads(line[len(SSE_DATA_PREFIX):])
+
+def test_sse_connection(client: TestClient):
     """Test SSE connection establishment"""
     with client.websocket_connect("/ws") as websocket:
         data = {"type": "connection_test"}
@@ -15,8 +63,8 @@ def test_sse_connection():
         response = websocket.receive_json()
         assert response["status"] == "ok"
 
-@pytest.mark.asyncio
-async def test_sse_events():
+@pytest.mark.asyncio(loop_scope="module")
+async def test_sse_events(sse_client: httpx.AsyncClient):
     """Test SSE event broadcasting"""
     # Create test event data
     test_event = {
@@ -24,70 +72,85 @@ async def test_sse_events():
         "data": "Hello SSE!",
         "timestamp": datetime.now().isoformat()
     }
-    
+
     # Connect to SSE endpoint
-    with client.get("/events/test_client", stream=True) as response:
+    async with sse_client.stream("GET", "/events/test_client") as response:
         assert response.status_code == 200
-        assert response.headers["content-type"] == "text/event-stream"
-        
+        assert response.headers["content-type"].startswith("text/event-stream")
+
         # Broadcast test event
-        await app.broadcast_event(test_event, "test_client")
-        
+        await main.broadcast_event(test_event, "test_client")
+
         # Read SSE response
-        for line in response.iter_lines():
-            if line:
-                if line.startswith(b"data: "):
-                    event_data = json.loads(line.decode("utf-8").replace("data: ", ""))
-                    assert event_data["type"] == "test_event"
-                    assert event_data["data"] == "Hello SSE!"
-                    break
-
-@pytest.mark.asyncio
-async def test_tool_execution_sse():
+        event_data = await asyncio.wait_for(read_first_sse_event(response), timeout=1.0)
+        assert event_data["type"] == "test_event"
+        assert event_data["data"] == "Hello SSE!"
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_tool_execution_sse(sse_client: httpx.AsyncClient):
     """Test tool execution with SSE updates"""
     test_params = {
         "param1": "value1",
         "param2": "value2"
     }
-    
+
     # Connect to SSE endpoint
-    with client.get("/events/test_client", stream=True) as sse_response:
+    async with sse_client.stream("GET", "/events/test_client") as sse_response:
         assert sse_response.status_code == 200
-        
+
         # Execute tool
-        tool_response = client.post(
+        tool_response = await sse_client.post(
             "/tool/test_tool/test_command",
             json=test_params
         )
         assert tool_response.status_code == 200
-        
+
         # Verify SSE event
-        for line in sse_response.iter_lines():
-            if line:
-                if line.startswith(b"data: "):
-                    event_data = json.loads(line.decode("utf-8").replace("data: ", ""))
-                    assert event_data["type"] == "tool_execution"
-                    assert event_data["tool"] == "test_tool"
-                    assert event_data["command"] == "test_command"
-                    break
-
-@pytest.mark.asyncio
-async def test_sse_cleanup():
+        event_data = await asyncio.wait_for(read_first_sse_event(sse_response), timeout=1.0)
+        assert event_data["type"] == "tool_execution"
+        assert event_data["tool"] == "test_tool"
+        assert event_data["command"] == "test_command"
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_sse_cleanup(sse_client: httpx.AsyncClient):
     """Test SSE connection cleanup"""
     # Connect first client
-    with client.get("/events/client1", stream=True) as response1:
+    async with sse_client.stream("GET", "/events/client1") as response1:
         assert response1.status_code == 200
-        assert "client1" in app.event_subscribers
-        
+        assert "client1" in main.event_subscribers
+        client1_gone = main.get_unsubscribed_event("client1")
+
         # Connect second client
-        with client.get("/events/client2", stream=True) as response2:
+        async with sse_client.stream("GET", "/events/client2") as response2:
             assert response2.status_code == 200
-            assert "client2" in app.event_subscribers
-        
-        # Wait a bit and verify client2 was cleaned up
-        await asyncio.sleep(0.1)
-        assert "client2" not in app.event_subscribers
-    
-    # Wait a bit and verify client1 was cleaned up
-    await asyncio.sleep(0.1)
-    assert "client1" not in app.event_subscribers 
\ No newline at end of file
+            assert "client2" in main.event_subscribers
+            client2_gone = main.get_unsubscribed_event("client2")
+
+        # Verify client2 is cleaned up once it disconnects
+        await asyncio.wait_for(client2_gone.wait(), timeout=1.0)
+        assert "client2" not in main.event_subscribers
+
+    # Verify client1 is cleaned up once it disconnects
+    await asyncio.wait_for(client1_gone.wait(), timeout=1.0)
+    assert "client1" not in main.event_subscribers
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_sse_cleanup_before_streaming():
+    """Test SSE cleanup when the connection fails before any event is streamed"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/events/early_client",
+        "raw_path": b"/events/early_client", "query_string": b"", "root_path": "",
+        "headers": [], "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80)
+    }
+
+    async def receive():
+        await asyncio.Event().wait()
+
+    async def send(message):
+        # The connection drops before the response headers go out
+        raise OSError("connection reset")
+
+    with pytest.raises(OSError):
+        await asyncio.wait_for(app(scope, receive, send), timeout=1.0)
+    assert "early_client" not in main.event_subscribers
@@ -1,138 +1,175 @@
 #!/usr/bin/env python3
 """Tests for the Git Context Builder tool."""
 
-import asyncio
-import os
 import shutil
-import tempfile
-from datetime import datetime
 from pathlib import Path
-from typing import AsyncGenerator, Generator
+from typing import AsyncGenerator, List, Optional
 
-import git
+import pygit2
 import pytest
-from git import Repo
-from qdrant_client import QdrantClient
 from qdrant_client.http import models
 
 from src.tools.git_context_builder import GitContextBuilder
 
+GIT_COLLECTIONS = ("git_commits", "git_files", "git_authors", "git_relationships")
+
+SEED_FILES = {
+    "README.md": "# Test Repository\nThis is a test repository.",
+    "main.py": "def main():\n    print('Hello, World!')\n\nif __name__ == '__main__':\n    main()",
+    "utils/helper.py": "def helper():\n    return 'I am helping!'"
+}
+
+SIGNATURE = pygit2.Signature("Test Author", "test@example.com")
+
 # Test fixtures
-@pytest.fixture
-def temp_repo() -> Generator[str, None, None]:
-    """Create a temporary Git repository for testing."""
-    temp_dir = tempfile.mkdtemp()
-    repo = Repo.init(temp_dir)
-    
-    # Create some test files
-    files = {
-        "README.md": "# Test Repository\nThis is a test repository.",
-        "main.py": "def main():\n    print('Hello, World!')\n\nif __name__ == '__main__':\n    main()",
-        "utils/helper.py": "def helper():\n    return 'I am helping!'"
-    }
-    
-    # Add files and make commits
-    for path, content in files.items():
-        file_path = Path(temp_dir) / path
+def _init_repo(path: Path) -> pygit2.Repository:
+    """Initialise a throwaway repository."""
+    # Seed repositories are written through libgit2 rather than GitPython;
+    # libgit2 leaves fsync off (GIT_OPT_ENABLE_FSYNC_GITDIR) by default
+    return pygit2.init_repository(str(path))
+
+def _commit(repo: pygit2.Repository, paths: List[str], message: str) -> None:
+    """Stage paths from the working tree and commit them on HEAD."""
+    index = repo.index
+    for path in paths:
+        index.add(path)
+    index.write()
+    parents = [] if repo.head_is_unborn else [repo.head.target]
+    repo.create_commit("HEAD", SIGNATURE, SIGNATURE, message, index.write_tree(), parents)
+
+def _write_files(root: Path) -> List[str]:
+    """Write the seed files into root and return their relative paths."""
+    for path, content in SEED_FILES.items():
+        file_path = root / path
         file_path.parent.mkdir(parents=True, exist_ok=True)
         file_path.write_text(content)
-        repo.index.add([str(file_path.relative_to(temp_dir))])
-        repo.index.commit(f"Add {path}")
+    return list(SEED_FILES)
+
+def _copy_repo(source: Path, tmp_path_factory: pytest.TempPathFactory) -> str:
+    """Give a test its own copy of a session-built repository."""
+    temp_dir = tmp_path_factory.mktemp("repo", numbered=True)
+    shutil.copytree(source, temp_dir, dirs_exist_ok=True)
+    return str(temp_dir)
+
+@pytest.fixture(scope="session")
+def _single_commit_repo(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Build a repository holding every seed file in one commit."""
+    temp_dir = tmp_path_factory.mktemp("single_commit_repo")
+    repo = _init_repo(temp_dir)
+    paths = _write_files(temp_dir)
+    _commit(repo, paths, f"Add {', '.join(paths)}")
+    return temp_dir
+
+@pytest.fixture(scope="session")
+def _multi_commit_repo(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Build a repository with a commit per seed file plus an update."""
+    temp_dir = tmp_path_factory.mktemp("multi_commit_repo")
+    repo = _init_repo(temp_dir)
+    
+    # Add files and make commits
+    for path in _write_files(temp_dir):
+        _commit(repo, [path], f"Add {path}")
     
     # Make some changes and additional commits
-    readme_path = Path(temp_dir) / "README.md"
+    readme_path = temp_dir / "README.md"
     readme_path.write_text(readme_path.read_text() + "\nUpdated content.")
-    repo.index.add([str(readme_path.relative_to(temp_dir))])
-    repo.index.commit("Update README")
+    _commit(repo, ["README.md"], "Update README")
     
-    yield temp_dir
-    shutil.rmtree(temp_dir)
+    return temp_dir
+
+@pytest.fixture
+def temp_repo(_single_commit_repo: Path, tmp_path_factory: pytest.TempPathFactory) -> str:
+    """Create a temporary Git repository for testing."""
+    return _copy_repo(_single_commit_repo, tmp_path_factory)
 
 @pytest.fixture
-def temp_multi_repo() -> Generator[tuple[str, str], None, None]:
+def temp_multi_commit_repo(_multi_commit_repo: Path, tmp_path_factory: pytest.TempPathFactory) -> str:
+    """Create a temporary Git repository with several related commits."""
+    return _copy_repo(_multi_commit_repo, tmp_path_factory)
+
+@pytest.fixture
+def temp_multi_repo(tmp_path_factory: pytest.TempPathFactory) -> tuple[str, str]:
     """Create two temporary Git repositories for testing multi-repo features."""
-    temp_dir1 = tempfile.mkdtemp()
-    temp_dir2 = tempfile.mkdtemp()
+    temp_dir1 = tmp_path_factory.mktemp("repo", numbered=True)
+    temp_dir2 = tmp_path_factory.mktemp("repo", numbered=True)
     
     # Create first repo
-    repo1 = Repo.init(temp_dir1)
-    (Path(temp_dir1) / "README.md").write_text("# Repo 1\nThis is the first test repo.")
-    repo1.index.add(["README.md"])
-    repo1.index.commit("Initial commit for repo 1")
+    repo1 = _init_repo(temp_dir1)
+    (temp_dir1 / "README.md").write_text("# Repo 1\nThis is the first test repo.")
+    _commit(repo1, ["README.md"], "Initial commit for repo 1")
     
     # Create second repo with similar content
-    repo2 = Repo.init(temp_dir2)
-    (Path(temp_dir2) / "README.md").write_text("# Repo 2\nThis is the second test repo.")
-    repo2.index.add(["README.md"])
-    repo2.index.commit("Initial commit for repo 2")
+    repo2 = _init_repo(temp_dir2)
+    (temp_dir2 / "README.md").write_text("# Repo 2\nThis is the second test repo.")
+    _commit(repo2, ["README.md"], "Initial commit for repo 2")
     
-    yield temp_dir1, temp_dir2
-    shutil.rmtree(temp_dir1)
-    shutil.rmtree(temp_dir2)
+    return str(temp_dir1), str(temp_dir2)
 
-@pytest.fixture
-async def context_builder() -> AsyncGenerator[GitContextBuilder, None]:
-    """Create a GitContextBuilder instance for testing."""
-    builder = GitContextBuilder()
+@pytest.fixture(scope="session")
+async def context_builder(
+    qdrant_location: Optional[str],
+    tmp_path_factory: pytest.TempPathFactory,
+    worker_id: str
+) -> AsyncGenerator[GitContextBuilder, None]:
+    """Create one GitContextBuilder per pytest-xdist worker, shared by its tests."""
+    # In-process Qdrant is already private to each worker; workers sharing
+    # a real server get their own collections instead
+    suffix = f"_w{worker_id}" if qdrant_location is None else ""
+    # A private embedding cache, so runs never read or grow the shared one
+    builder = GitContextBuilder(
+        cache_dir=str(tmp_path_factory.mktemp("embedding_cache")),
+        prefer_grpc=True,
+        pool_size=100,
+        qdrant_location=qdrant_location,
+        collection_suffix=suffix
+    )
     yield builder
     
-    # Cleanup collections after tests
-    collections = builder.client.get_collections().collections
-    for collection in collections:
-        builder.client.delete_collection(collection.name)
+    # Cleanup once after the session, leaving other collections on the
+    # server (such as ContextStore's) alone
+    for collection_name in GIT_COLLECTIONS:
+        builder.client.delete_collection(builder._collection(collection_name))
+
+def _scroll_all(builder: GitContextBuilder, collection_name: str, context_name: str) -> List[models.Record]:
+    """Fetch every point of a context in one scroll, without vectors."""
+    return builder.client.scroll(
+        collection_name=builder._collection(collection_name),
+        scroll_filter=models.Filter(
+            must=[
+                models.FieldCondition(
+                    key="context_name",
+                    match=models.MatchValue(value=context_name)
+                )
+            ]
+        ),
+        limit=1000
+    )[0]
 
 # Tests
-@pytest.mark.asyncio
-async def test_context_builder_initialization(context_builder: GitContextBuilder):
+def test_context_builder_initialization(context_builder: GitContextBuilder):
     """Test that the context builder initializes correctly."""
     collections = context_builder.client.get_collections().collections
     collection_names = {c.name for c in collections}
     
-    assert "git_commits" in collection_names
-    assert "git_files" in collection_names
-    assert "git_authors" in collection_names
-    assert "git_relationships" in collection_names
+    assert {context_builder._collection(name) for name in GIT_COLLECTIONS} <= collection_names
 
 @pytest.mark.asyncio
 async def test_build_context(context_builder: GitContextBuilder, temp_repo: str):
     """Test building context from a single repository."""
-    await context_builder.build_context(temp_repo, "test-context")
+    await context_builder.build_context(temp_repo, "test-context", batch_size=64)
     
     # Check commits were processed
-    commits = context_builder.client.scroll(
-        collection_name="git_commits",
-        scroll_filter=models.Filter(
-            must=[
-                models.FieldCondition(
-                    key="context_name",
-                    match=models.MatchValue(value="test-context")
-                )
-            ]
-        ),
-        limit=100
-    )[0]
+    commits = _scroll_all(context_builder, "git_commits", "test-context")
     
     assert len(commits) > 0
     assert any("README.md" in commit.payload["message"] for commit in commits)
     
     # Check files were processed
-    files = context_builder.client.scroll(
-        collection_name="git_files",
-        scroll_filter=models.Filter(
-            must=[
-                models.FieldCondition(
-                    key="context_name",
-                    match=models.MatchValue(value="test-context")
-                )
-            ]
-        ),
-        limit=100
-    )[0]
+    files = _scroll_all(context_builder, "git_files", "test-context")
     
-    assert len(files) > 0
-    assert any(file.payload["path"] == "README.md" for file in files)
-    assert any(file.payload["path"] == "main.py" for file in files)
-    assert any(file.payload["path"] == "utils/helper.py" for file in files)
+    paths = {file.payload["path"] for file in files}
+    assert {"README.md", "main.py", "utils/helper.py"} <= paths
+    assert all(file.payload["last_modified"] for file in files)
 
 @pytest.mark.asyncio
 async def test_multi_repo_context(
@@ -150,24 +187,9 @@ async def test_multi_repo_context(
     await context_builder.build_multi_repo_relationships("multi-test")
     
     # Check relationships were created
-    relationships = context_builder.client.scroll(
-        collection_name="git_relationships",
-        scroll_filter=models.Filter(
-            must=[
-                models.FieldCondition(
-                    key="context_name",
-                    match=models.MatchValue(value="multi-test")
-                ),
-                models.FieldCondition(
-                    key="type",
-                    match=models.MatchValue(value="cross_repo_similarity")
-                )
-            ]
-        ),
-        limit=100
-    )[0]
+    relationships = _scroll_all(context_builder, "git_relationships", "multi-test")
     
-    assert len(relationships) > 0
+    assert any(r.payload["type"] == "cross_repo_similarity" for r in relationships)
 
 @pytest.mark.asyncio
 async def test_list_contexts(context_builder: GitContextBuilder, temp_repo: str):
@@ -202,18 +224,7 @@ async def test_author_processing(context_builder: GitContextBuilder, temp_repo:
     await context_builder.build_context(temp_repo, "author-test")
     
     # Check author information
-    authors = context_builder.client.scroll(
-        collection_name="git_authors",
-        scroll_filter=models.Filter(
-            must=[
-                models.FieldCondition(
-                    key="context_name",
-                    match=models.MatchValue(value="author-test")
-                )
-            ]
-        ),
-        limit=100
-    )[0]
+    authors = _scroll_all(context_builder, "git_authors", "author-test")
     
     assert len(authors) > 0
     author = authors[0]
@@ -227,25 +238,14 @@ async def test_author_processing(context_builder: GitContextBuilder, temp_repo:
 @pytest.mark.asyncio
 async def test_relationship_building(
     context_builder: GitContextBuilder,
-    temp_repo: str
+    temp_multi_commit_repo: str
 ):
     """Test building relationships between commits."""
     # Build context
-    await context_builder.build_context(temp_repo, "relationship-test")
+    await context_builder.build_context(temp_multi_commit_repo, "relationship-test")
     
     # Check relationships
-    relationships = context_builder.client.scroll(
-        collection_name="git_relationships",
-        scroll_filter=models.Filter(
-            must=[
-                models.FieldCondition(
-                    key="context_name",
-                    match=models.MatchValue(value="relationship-test")
-                )
-            ]
-        ),
-        limit=100
-    )[0]
+    relationships = _scroll_all(context_builder, "git_relationships", "relationship-test")
     
     assert len(relationships) > 0
     relationship = relationships[0]
@@ -253,4 +253,64 @@ async def test_relationship_building(
     assert "source_id" in relationship.payload
     assert "target_id" in relationship.payload
     assert "similarity" in relationship.payload
-    assert relationship.payload["similarity"] > 0.0 
\ No newline at end of file
+    assert relationship.payload["similarity"] > 0.0 
+
+@pytest.mark.asyncio
+async def test_embedding_cache(
+    context_builder: GitContextBuilder,
+    temp_repo: str,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch
+):
+    """Test that rebuilds and duplicate texts are not encoded again."""
+    # Start empty, since earlier tests already cached the seed repo's texts
+    monkeypatch.setattr(
+        context_builder, "_embedding_cache", GitContextBuilder._open_embedding_cache(str(tmp_path))
+    )
+    encoded: List[str] = []
+    encode = context_builder.model.encode
+    
+    def counting_encode(texts, *args, **kwargs):
+        encoded.extend(texts)
+        return encode(texts, *args, **kwargs)
+    
+    monkeypatch.setattr(context_builder.model, "encode", counting_encode)
+    
+    # Duplicates within one call go through the model once
+    context_builder._encode_many(["cache-test text", "cache-test text"])
+    assert encoded == ["cache-test text"]
+    
+    # A rebuild finds every embedding in the cache
+    await context_builder.build_context(temp_repo, "cache-test")
+    assert encoded
+    encoded.clear()
+    await context_builder.build_context(temp_repo, "cache-test")
+    assert encoded == []
+
+@pytest.mark.asyncio
+async def test_contexts_do_not_share_points(context_builder: GitContextBuilder, temp_repo: str):
+    """Test that building one repo into two contexts keeps both intact."""
+    await context_builder.build_context(temp_repo, "shared-a")
+    await context_builder.build_context(temp_repo, "shared-b")
+    
+    for collection_name in ("git_commits", "git_files", "git_authors"):
+        ids_a = {p.id for p in _scroll_all(context_builder, collection_name, "shared-a")}
+        ids_b = {p.id for p in _scroll_all(context_builder, collection_name, "shared-b")}
+        assert ids_a and ids_b
+        assert ids_a.isdisjoint(ids_b)
+    
+    assert len(_scroll_all(context_builder, "git_files", "shared-a")) == len(SEED_FILES)
+
+@pytest.mark.asyncio
+async def test_concurrent_upload(context_builder: GitContextBuilder, temp_multi_commit_repo: str):
+    """Test that small batches uploaded concurrently all arrive."""
+    await context_builder.build_context(
+        temp_multi_commit_repo, "concurrent-test", batch_size=1, concurrency=4
+    )
+    
+    commits = _scroll_all(context_builder, "git_commits", "concurrent-test")
+    files = _scroll_all(context_builder, "git_files", "concurrent-test")
+    
+    # One commit per seed file plus the README update
+    assert len(commits) == len(SEED_FILES) + 1
+    assert len(files) == len(SEED_FILES)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Tests for the Git Context Visualizer's history parsing and downsampling."""
+
+from pathlib import Path
+from typing import Dict, List
+
+import git
+import numpy as np
+import pygit2
+import pytest
+
+from src.tools.git_context_visualizer import GitContextVisualizer, _lttb_indices
+
+SIGNATURE = pygit2.Signature("Test Author", "test@example.com")
+
+def _commit(
+    repo: pygit2.Repository,
+    root: Path,
+    files: Dict[str, bytes],
+    message: str,
+    ref: str = "HEAD",
+    parents: List[pygit2.Oid] = None,
+    remove: List[str] = ()
+) -> pygit2.Oid:
+    """Write files, stage them (dropping `remove`) and commit onto ref."""
+    index = repo.index
+    for path, content in files.items():
+        (root / path).write_bytes(content)
+        index.add(path)
+    for path in remove:
+        index.remove(path)
+    index.write()
+    if parents is None:
+        parents = [] if repo.head_is_unborn else [repo.head.target]
+    return repo.create_commit(ref, SIGNATURE, SIGNATURE, message, index.write_tree(), parents)
+
+@pytest.fixture
+def history_repo(tmp_path: Path) -> str:
+    """Build a history with a root commit, a binary file, a branch and a merge."""
+    repo = pygit2.init_repository(str(tmp_path))
+    _commit(repo, tmp_path, {"a.txt": b"a\n", "b.txt": b"b\n"}, "Root commit")
+    base = _commit(repo, tmp_path, {"logo.png": b"\x89PNG\r\n\x1a\n\0\0\x01"}, "Add a binary file")
+
+    # A side branch that HEAD doesn't follow
+    feature = _commit(
+        repo, tmp_path, {"c.txt": b"c\n"}, "Add c on a branch",
+        ref="refs/heads/feature", parents=[base]
+    )
+    main = _commit(repo, tmp_path, {"a.txt": b"a changed\n"}, "Change a", remove=["c.txt"])
+
+    # The merge brings in c.txt and also edits b.txt itself
+    _commit(
+        repo, tmp_path, {"c.txt": b"c\n", "b.txt": b"b merged\n"}, "Merge feature",
+        parents=[main, feature]
+    )
+    return str(tmp_path)
+
+def test_files_changed_matches_commit_stats(history_repo: str):
+    """Test that the git log parser counts files like GitPython's commit.stats."""
+    history = GitContextVisualizer(history_repo).get_commit_history()
+    parsed = dict(zip(history['hash'], history['files_changed']))
+
+    expected = {
+        commit.hexsha[:7]: len(commit.stats.files)
+        for commit in git.Repo(history_repo).iter_commits()
+    }
+
+    assert parsed == expected
+    # Root, binary, branch, main and merge commits are all present
+    assert len(parsed) == 5
+    messages = dict(zip(history['message'], history['files_changed']))
+    assert messages["Add a binary file"] == 1
+    assert messages["Merge feature"] == 2
+
+def test_lttb_keeps_endpoints_and_order():
+    """Test that LTTB returns `threshold` increasing indices including both ends."""
+    rng = np.random.default_rng(0)
+    n, threshold = 1000, 100
+    x = np.sort(rng.uniform(0, 1e6, n))
+    y = rng.standard_normal(n)
+
+    indices = _lttb_indices(x, y, threshold)
+
+    assert len(indices) == threshold
+    assert indices[0] == 0
+    assert indices[-1] == n - 1
+    assert np.all(np.diff(indices) > 0)
+
+@pytest.mark.parametrize("threshold", [2, 1000, 5000])
+def test_lttb_returns_everything_when_not_downsampling(threshold: int):
+    """Test that thresholds below 3 or at least n keep every point."""
+    x = np.arange(1000, dtype=np.float64)
+
+    assert np.array_equal(_lttb_indices(x, x, threshold), np.arange(1000))
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Tests for the Smart Tree tool."""
+
+from pathlib import Path
+from typing import Dict, Set
+
+import pygit2
+import pytest
+
+from src.tools.smart_tree import SmartTree
+
+GITIGNORE = "*.log\n!keep.log\nbuild/\n"
+
+TREE_FILES = {
+    ".gitignore": GITIGNORE,
+    "debug.log": "noise",
+    "keep.log": "kept by negation",
+    "build/out.txt": "build output",
+    "notes/build": "a file named like an ignored directory",
+    "README.md": "Start with src/app.py and src/pkg/util.py",
+    "src/app.py": "import os\nfrom .pkg import util\nfrom ..shared.config import settings\n",
+    "src/pkg/util.py": "from . import app\n",
+}
+
+def _write_tree(root: Path, files: Dict[str, str]) -> None:
+    """Write files (relative path -> content) under root."""
+    for path, content in files.items():
+        file_path = root / path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(content)
+
+def _build(root: Path) -> SmartTree:
+    tree = SmartTree(str(root), use_color=False)
+    tree.build()
+    return tree
+
+def _paths(tree: SmartTree) -> Set[str]:
+    return {path.as_posix() for path in tree.nodes}
+
+@pytest.fixture
+def fallback_tree(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> SmartTree:
+    """Build a tree with the pathspec matcher, as outside a git work tree."""
+    root = tmp_path / "fallback"
+    _write_tree(root, TREE_FILES)
+    with monkeypatch.context() as mp:
+        mp.setattr(SmartTree, "_load_git_paths", lambda self: None)
+        return _build(root)
+
+def test_fallback_patterns(fallback_tree: SmartTree):
+    """Test negation and directory-only patterns in pathspec mode."""
+    paths = _paths(fallback_tree)
+
+    assert "debug.log" not in paths
+    assert "keep.log" in paths
+    # `build/` matches the directory but not a file called build
+    assert "build" not in paths and "build/out.txt" not in paths
+    assert "notes/build" in paths
+
+def test_git_mode_matches_fallback(tmp_path: Path, fallback_tree: SmartTree):
+    """Test that git ls-files and the pathspec fallback keep the same entries."""
+    repo_root = tmp_path / "repo"
+    _write_tree(repo_root, TREE_FILES)
+    pygit2.init_repository(str(repo_root))
+
+    tree = _build(repo_root)
+
+    assert tree._git_paths is not None
+    assert _paths(tree) == _paths(fallback_tree)
+
+def test_ignored_root_lists_contents(tmp_path: Path):
+    """Test that an ignored directory used as the root still lists its files."""
+    _write_tree(tmp_path, {".gitignore": "build/\n", "build/out.txt": "x", "build/sub/more.txt": "y"})
+    pygit2.init_repository(str(tmp_path))
+
+    tree = _build(tmp_path / "build")
+
+    assert _paths(tree) == {"out.txt", "sub", "sub/more.txt"}
+
+def test_python_imports(fallback_tree: SmartTree):
+    """Test that absolute and relative imports keep their leading dots."""
+    assert fallback_tree.nodes[Path("src/app.py")].imports == {"os", ".pkg", "..shared.config"}
+    assert fallback_tree.nodes[Path("src/pkg/util.py")].imports == {"."}
+    assert fallback_tree.nodes[Path("README.md")].imports == set()
+
+def test_file_references(fallback_tree: SmartTree):
+    """Test that path mentions become references in both directions."""
+    readme = Path("README.md")
+    app = Path("src/app.py")
+    util = Path("src/pkg/util.py")
+
+    assert {app, util} <= fallback_tree.nodes[readme].references
+    assert readme in fallback_tree.nodes[app].referenced_by
+    assert readme in fallback_tree.nodes[util].referenced_by
+    # A file never references itself
+    assert app not in fallback_tree.nodes[app].references